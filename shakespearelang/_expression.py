@@ -42,6 +42,29 @@ class Expression(ABC):
     def _evaluate_logic(self, state: State) -> int:
         pass
 
+    def compile(self) -> Callable[[State], int]:
+        # Compiled evaluators skip the check that the speaker is on stage: they
+        # are only ever called from compiled sentences, which have already made it.
+        return self._compile_logic()
+
+    @abstractmethod
+    def _compile_logic(self) -> Callable[[State], int]:
+        pass
+
+
+def _with_parseinfo(
+    evaluate: Callable[[State], int], parseinfo
+) -> Callable[[State], int]:
+    def evaluate_with_parseinfo(state: State) -> int:
+        try:
+            return evaluate(state)
+        except ShakespeareRuntimeError as exc:
+            if not exc.parseinfo:
+                exc.parseinfo = parseinfo
+            raise exc
+
+    return evaluate_with_parseinfo
+
 
 class FirstPersonValue(Expression):
     def _setup(self) -> None:
@@ -50,6 +73,10 @@ class FirstPersonValue(Expression):
     def _evaluate_logic(self, state: State) -> int:
         return state.character_by_name(self.character).value
 
+    def _compile_logic(self) -> Callable[[State], int]:
+        character = self.character
+        return lambda state: state.characters[character].value
+
 
 class SecondPersonValue(Expression):
     def _setup(self) -> None:
@@ -59,6 +86,13 @@ class SecondPersonValue(Expression):
         character_opposite = state.character_opposite(self.character)
         return state.character_by_name(character_opposite).value
 
+    def _compile_logic(self) -> Callable[[State], int]:
+        character = self.character
+        return _with_parseinfo(
+            lambda state: state.characters[state.character_opposite(character)].value,
+            self.ast_node.parseinfo,
+        )
+
 
 class CharacterName(Expression):
     def _setup(self) -> None:
@@ -67,6 +101,13 @@ class CharacterName(Expression):
     def _evaluate_logic(self, state: State) -> int:
         return state.character_by_name(self.name).value
 
+    def _compile_logic(self) -> Callable[[State], int]:
+        name = self.name
+        return _with_parseinfo(
+            lambda state: state.character_by_name(name).value,
+            self.ast_node.parseinfo,
+        )
+
 
 class NegativeNounPhrase(Expression):
     def _setup(self) -> None:
@@ -75,6 +116,10 @@ class NegativeNounPhrase(Expression):
     def _evaluate_logic(self, state: State) -> int:
         return -pow(2, len(self.ast_node.adjectives))  # type: ignore
 
+    def _compile_logic(self) -> Callable[[State], int]:
+        value = self._evaluate_logic(None)  # type: ignore
+        return lambda state: value
+
 
 class PositiveNounPhrase(Expression):
     def _setup(self) -> None:
@@ -83,6 +128,10 @@ class PositiveNounPhrase(Expression):
     def _evaluate_logic(self, state: State) -> int:
         return pow(2, len(self.ast_node.adjectives))  # type: ignore
 
+    def _compile_logic(self) -> Callable[[State], int]:
+        value = self._evaluate_logic(None)  # type: ignore
+        return lambda state: value
+
 
 class Nothing(Expression):
     def _setup(self) -> None:
@@ -91,6 +140,10 @@ class Nothing(Expression):
     def _evaluate_logic(self, state: State) -> int:
         return 0
 
+    def _compile_logic(self) -> Callable[[State], int]:
+        value = self._evaluate_logic(None)  # type: ignore
+        return lambda state: value
+
 
 def _evaluate_factorial(operand: int) -> int:
     if operand < 0:
@@ -126,6 +179,15 @@ class UnaryOperation(Expression):
     def _evaluate_logic(self, state: State) -> int:
         return self.operation(self.operand.evaluate(state))
 
+    def _compile_logic(self) -> Callable[[State], int]:
+        operand = self.operand.compile()
+        operation = self.operation
+        if operation in _RAISING_OPERATIONS:
+            return _with_parseinfo(
+                lambda state: operation(operand(state)), self.ast_node.parseinfo
+            )
+        return lambda state: operation(operand(state))
+
 
 def _evaluate_quotient(first_operand: int, second_operand: int) -> int:
     if second_operand == 0:
@@ -165,6 +227,30 @@ class BinaryOperation(Expression):
             self.first_operand.evaluate(state), self.second_operand.evaluate(state)
         )
 
+    def _compile_logic(self) -> Callable[[State], int]:
+        first = self.first_operand.compile()
+        second = self.second_operand.compile()
+        operator = self.ast_node.operation
+        if operator == ("the", "sum", "of"):
+            return lambda state: first(state) + second(state)
+        if operator == ("the", "difference", "between"):
+            return lambda state: first(state) - second(state)
+        if operator == ("the", "product", "of"):
+            return lambda state: first(state) * second(state)
+        operation = self.operation
+        return _with_parseinfo(
+            lambda state: operation(first(state), second(state)),
+            self.ast_node.parseinfo,
+        )
+
+
+_RAISING_OPERATIONS = {
+    _evaluate_factorial,
+    _evaluate_square_root,
+    _evaluate_quotient,
+    _evaluate_remainder,
+}
+
 
 _EXPRESSION_CONSTRUCTORS: dict[str, type[Expression]] = {
     "first_person_value": FirstPersonValue,
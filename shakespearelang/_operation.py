@@ -1,10 +1,15 @@
 from abc import ABC, abstractmethod
+from typing import Callable
+
 from tatsu.ast import AST
 
 from ._expression import expression_from_ast
 from ._utils import normalize_name
 from .errors import ShakespeareRuntimeError, ShakespeareParseError
 
+# Takes the state and settings, returns the position of the next operation to run.
+CompiledOperation = Callable[..., int]
+
 
 class Operation(ABC):
     def __init__(self, ast_node: AST):
@@ -27,6 +32,33 @@ class Operation(ABC):
     def _run_logic(self, state, settings):
         pass
 
+    def compile(self, position: int, play) -> CompiledOperation:
+        """
+        Build a closure that runs this operation as the operation at the given
+        position of the play, with no output beyond that of the play itself. The
+        closure returns the position of the next operation to run.
+        """
+        logic = self._compile_logic(position + 1)
+        parseinfo = self.ast_node.parseinfo
+
+        def run(state, settings):
+            try:
+                return logic(state, settings)
+            except ShakespeareRuntimeError as exc:
+                if not exc.parseinfo:
+                    exc.parseinfo = parseinfo
+                raise exc
+
+        return run
+
+    @abstractmethod
+    def _compile_logic(self, next_position: int) -> CompiledOperation:
+        pass
+
+
+class BreakpointReached(Exception):
+    """Raised by a compiled breakpoint to hand control back to the interpreter."""
+
 
 class Entrance(Operation):
     def _setup(self, ast_node: AST):
@@ -37,6 +69,15 @@ class Entrance(Operation):
             print(f"Enter {', '.join(self.characters)}")
         state.enter_characters(self.characters)
 
+    def _compile_logic(self, next_position: int) -> CompiledOperation:
+        characters = self.characters
+
+        def run(state, settings):
+            state.enter_characters(characters)
+            return next_position
+
+        return run
+
 
 class Exit(Operation):
     def _setup(self, ast_node: AST):
@@ -47,6 +88,15 @@ class Exit(Operation):
             print(f"Exit {self.character}")
         state.exit_character(self.character)
 
+    def _compile_logic(self, next_position: int) -> CompiledOperation:
+        character = self.character
+
+        def run(state, settings):
+            state.exit_character(character)
+            return next_position
+
+        return run
+
 
 class Exeunt(Operation):
     def _setup(self, ast_node: AST):
@@ -65,6 +115,22 @@ class Exeunt(Operation):
                 print("Exeunt all")
             state.exeunt_all()
 
+    def _compile_logic(self, next_position: int) -> CompiledOperation:
+        characters = self.characters
+        if characters is None:
+
+            def run(state, settings):
+                state.exeunt_all()
+                return next_position
+
+        else:
+
+            def run(state, settings):
+                state.exeunt_characters(characters)
+                return next_position
+
+        return run
+
 
 class Breakpoint(Operation):
     def _setup(self, ast_node: AST):
@@ -73,6 +139,15 @@ class Breakpoint(Operation):
     def _run_logic(self, state, settings):
         pass
 
+    def compile(self, position: int, play) -> CompiledOperation:
+        def run(state, settings):
+            raise BreakpointReached()
+
+        return run
+
+    def _compile_logic(self, next_position: int) -> CompiledOperation:
+        raise NotImplementedError()
+
 
 class SentenceOperation(Operation):
     def __init__(self, ast_node: AST, character: str):
@@ -108,6 +183,38 @@ class SentenceOperation(Operation):
                     exc.parseinfo = self.ast_node.parseinfo
                 raise exc
 
+    def compile(self, position: int, play) -> CompiledOperation:
+        next_position = position + 1
+        logic = self._compile_logic(next_position)
+        character = self.character
+        parseinfo = self.ast_node.parseinfo
+        if not self.has_condition:
+
+            def run(state, settings):
+                state.assert_character_on_stage(character)
+                try:
+                    return logic(state, settings)
+                except ShakespeareRuntimeError as exc:
+                    if not exc.parseinfo:
+                        exc.parseinfo = parseinfo
+                    raise exc
+
+        else:
+            condition = self.condition_type_positive
+
+            def run(state, settings):
+                state.assert_character_on_stage(character)
+                if state.global_boolean != condition:
+                    return next_position
+                try:
+                    return logic(state, settings)
+                except ShakespeareRuntimeError as exc:
+                    if not exc.parseinfo:
+                        exc.parseinfo = parseinfo
+                    raise exc
+
+        return run
+
 
 class Question(SentenceOperation):
     _COMPARATIVE_TYPE_HANDLERS = {
@@ -143,6 +250,17 @@ class Question(SentenceOperation):
             self.first_value.evaluate(state), self.second_value.evaluate(state)
         )
 
+    def _compile_logic(self, next_position: int) -> CompiledOperation:
+        first_value = self.first_value.compile()
+        second_value = self.second_value.compile()
+        comparison = self.comparison
+
+        def run(state, settings):
+            state.global_boolean = comparison(first_value(state), second_value(state))
+            return next_position
+
+        return run
+
 
 class Assignment(SentenceOperation):
     def _setup(self):
@@ -156,6 +274,17 @@ class Assignment(SentenceOperation):
         if settings.output_style in ["verbose", "debug"]:
             print(f"{character_opposite} set to {value}")
 
+    def _compile_logic(self, next_position: int) -> CompiledOperation:
+        character = self.character
+        value = self.value.compile()
+
+        def run(state, settings):
+            character_opposite = state.character_opposite(character)
+            state.characters[character_opposite].value = value(state)
+            return next_position
+
+        return run
+
 
 class Input(SentenceOperation):
     def _setup(self):
@@ -173,6 +302,26 @@ class Input(SentenceOperation):
 
         state.character_by_name(character_to_set).value = value
 
+    def _compile_logic(self, next_position: int) -> CompiledOperation:
+        character = self.character
+        if self.input_type == "number":
+
+            def run(state, settings):
+                character_to_set = state.character_opposite(character)
+                value = settings.input_manager.consume_numeric_input()
+                state.characters[character_to_set].value = value
+                return next_position
+
+        else:
+
+            def run(state, settings):
+                character_to_set = state.character_opposite(character)
+                value = settings.input_manager.consume_character_input()
+                state.characters[character_to_set].value = value
+                return next_position
+
+        return run
+
 
 class Output(SentenceOperation):
     def _setup(self):
@@ -188,6 +337,24 @@ class Output(SentenceOperation):
         else:
             settings.output_manager.output_character(value)
 
+    def _compile_logic(self, next_position: int) -> CompiledOperation:
+        character = self.character
+        if self.output_type == "number":
+
+            def run(state, settings):
+                value = state.characters[state.character_opposite(character)].value
+                settings.output_manager.output_number(value)
+                return next_position
+
+        else:
+
+            def run(state, settings):
+                value = state.characters[state.character_opposite(character)].value
+                settings.output_manager.output_character(value)
+                return next_position
+
+        return run
+
 
 class Push(SentenceOperation):
     def _setup(self):
@@ -201,6 +368,17 @@ class Push(SentenceOperation):
         if settings.output_style in ["verbose", "debug"]:
             print(f"{pushing_character} pushed {value}")
 
+    def _compile_logic(self, next_position: int) -> CompiledOperation:
+        character = self.character
+        value = self.value.compile()
+
+        def run(state, settings):
+            pushing_character = state.character_opposite(character)
+            state.characters[pushing_character].push(value(state))
+            return next_position
+
+        return run
+
 
 class Pop(SentenceOperation):
     def _setup(self):
@@ -213,6 +391,15 @@ class Pop(SentenceOperation):
         if settings.output_style in ["verbose", "debug"]:
             print(f"Popping stack of {popping_character}")
 
+    def _compile_logic(self, next_position: int) -> CompiledOperation:
+        character = self.character
+
+        def run(state, settings):
+            state.characters[state.character_opposite(character)].pop()
+            return next_position
+
+        return run
+
 
 class Goto(SentenceOperation):
     def _setup(self):
@@ -248,6 +435,49 @@ class Goto(SentenceOperation):
     def _run_logic(self, state, settings):
         pass
 
+    def compile(self, position: int, play) -> CompiledOperation:
+        # Like Goto.run, errors from gotos are deliberately left without parseinfo.
+        next_position = position + 1
+        character = self.character
+        new_position = self._static_destination(position, play)
+        message = f"{self.target} {self.destination} does not exist."
+        if not self.has_condition:
+
+            def run(state, settings):
+                state.assert_character_on_stage(character)
+                if new_position is None:
+                    raise ShakespeareRuntimeError(message)
+                return new_position
+
+        else:
+            condition = self.condition_type_positive
+
+            def run(state, settings):
+                state.assert_character_on_stage(character)
+                if state.global_boolean != condition:
+                    return next_position
+                if new_position is None:
+                    raise ShakespeareRuntimeError(message)
+                return new_position
+
+        return run
+
+    def _static_destination(self, position: int, play) -> int | None:
+        if self.target == "Act":
+            destination = play.act_indices.get(self.destination)
+        else:
+            destination = play.scene_indices[play.get_act(position)].get(
+                self.destination
+            )
+        if destination == position:
+            # The interpreter only jumps when the position changes, so a goto to
+            # the scene (or act) it opens carries on to the next operation.
+            return position + 1
+        return destination
+
+    def _compile_logic(self, next_position: int) -> CompiledOperation:
+        raise NotImplementedError()
+
 
 _OPERATIONS_CONSTRUCTORS = {
     "entrance": Entrance,
@@ -1,6 +1,8 @@
+from functools import cached_property
+
 from tatsu.ast import AST
 
-from ._operation import operations_from_event
+from ._operation import operations_from_event, CompiledOperation
 from .errors import ShakespeareRuntimeError
 
 
@@ -32,6 +34,13 @@ class Play:
                 for event in scene.events:
                     self.operations += operations_from_event(event)
 
+    @cached_property
+    def compiled_operations(self) -> list[CompiledOperation]:
+        return [
+            operation.compile(position, self)
+            for position, operation in enumerate(self.operations)
+        ]
+
     def get_act(self, position: int) -> int:
         last_act = None
         for act, pos in self.act_indices.items():
@@ -0,0 +1,441 @@
+from collections import OrderedDict
+from hashlib import sha256
+
+from ._expression import (
+    Expression,
+    FirstPersonValue,
+    SecondPersonValue,
+    CharacterName,
+    NegativeNounPhrase,
+    PositiveNounPhrase,
+    Nothing,
+    UnaryOperation,
+    BinaryOperation,
+    _evaluate_factorial,
+    _evaluate_square_root,
+    _evaluate_quotient,
+    _evaluate_remainder,
+)
+from ._operation import (
+    Entrance,
+    Exit,
+    Exeunt,
+    Breakpoint,
+    Question,
+    Assignment,
+    Input,
+    Output,
+    Push,
+    Pop,
+    Goto,
+)
+from .errors import ShakespeareRuntimeError
+
+_FUNCTION_NAME = "run_play"
+_FILENAME = "<shakespeare play>"
+
+
+class PythonProgram:
+    """
+    A play transpiled into a single Python function. Scenes (and the operations
+    after breakpoints) become labeled blocks in a dispatch loop, character values
+    live in local variables, and gotos become jumps to a label.
+    """
+
+    def __init__(self, play, names: list[str]):
+        generator = _Generator(play, names)
+        self.source: str = generator.generate()
+        self.labels: frozenset[int] = frozenset(generator.labels)
+        self._line_table = generator.line_table
+        self._constants = generator.constants
+        self._code = compile(self.source, _FILENAME, "exec")
+        self._function = None
+
+    def can_start_at(self, position: int) -> bool:
+        return position in self.labels
+
+    def run(self, interpreter) -> None:
+        """
+        Run the play from the interpreter's current position, which must be a
+        label, until the next breakpoint or the end of the play.
+        """
+        function = self._load()
+        position = interpreter.current_position
+        try:
+            position = function(interpreter.state, interpreter.settings, position)
+        except ShakespeareRuntimeError as exc:
+            position = self._locate_error(exc, position)
+            raise exc
+        finally:
+            interpreter.current_position = position
+
+    def _load(self):
+        if self._function is None:
+            namespace = dict(self._constants)
+            exec(self._code, namespace)
+            self._function = namespace[_FUNCTION_NAME]
+        return self._function
+
+    def _locate_error(self, exc, position):
+        traceback = exc.__traceback__
+        while traceback is not None:
+            if traceback.tb_frame.f_code.co_filename == _FILENAME:
+                break
+            traceback = traceback.tb_next
+        if traceback is None or traceback.tb_lineno not in self._line_table:
+            return position
+        position, parseinfo = self._line_table[traceback.tb_lineno]
+        if not exc.parseinfo:
+            exc.parseinfo = parseinfo
+        return position
+
+
+_PROGRAM_CACHE_SIZE = 32
+_program_cache: OrderedDict = OrderedDict()
+
+
+def cached_program(source: str):
+    """
+    Returns the (AST, PythonProgram) pair cached for the given play source, or
+    None.
+    """
+    key = _cache_key(source)
+    if key not in _program_cache:
+        return None
+    _program_cache.move_to_end(key)
+    return _program_cache[key]
+
+
+def cache_program(source: str, ast, program: PythonProgram) -> None:
+    _program_cache[_cache_key(source)] = (ast, program)
+    while len(_program_cache) > _PROGRAM_CACHE_SIZE:
+        _program_cache.popitem(last=False)
+
+
+def _cache_key(source: str) -> str:
+    return sha256(source.encode("utf-8")).hexdigest()
+
+
+def _with_parseinfo(function):
+    def function_with_parseinfo(*args):
+        parseinfo = args[-1]
+        try:
+            return function(*args[:-1])
+        except ShakespeareRuntimeError as exc:
+            if not exc.parseinfo:
+                exc.parseinfo = parseinfo
+            raise exc
+
+    return function_with_parseinfo
+
+
+def _opposite(state, character, parseinfo):
+    try:
+        return state.character_opposite(character)
+    except ShakespeareRuntimeError as exc:
+        if not exc.parseinfo:
+            exc.parseinfo = parseinfo
+        raise exc
+
+
+def _not_initialized(name, parseinfo):
+    raise ShakespeareRuntimeError(f"{name} was not initialized!", parseinfo=parseinfo)
+
+
+def _empty_stack():
+    raise ShakespeareRuntimeError("Tried to pop from an empty stack.")
+
+
+def _fail(message):
+    raise ShakespeareRuntimeError(message)
+
+
+_HELPERS = {
+    "factorial": _with_parseinfo(_evaluate_factorial),
+    "square_root": _with_parseinfo(_evaluate_square_root),
+    "quotient": _with_parseinfo(_evaluate_quotient),
+    "remainder": _with_parseinfo(_evaluate_remainder),
+    "opposite": _opposite,
+    "not_initialized": _not_initialized,
+    "empty_stack": _empty_stack,
+    "fail": _fail,
+}
+
+_UNARY_TEMPLATES = {
+    ("the", "cube", "of"): "({} ** 3)",
+    ("the", "square", "of"): "({} ** 2)",
+    "twice": "({} * 2)",
+}
+
+_UNARY_HELPERS = {
+    ("the", "factorial", "of"): "factorial",
+    ("the", "square", "root", "of"): "square_root",
+}
+
+_BINARY_TEMPLATES = {
+    ("the", "difference", "between"): "({} - {})",
+    ("the", "product", "of"): "({} * {})",
+    ("the", "sum", "of"): "({} + {})",
+}
+
+_BINARY_HELPERS = {
+    ("the", "quotient", "between"): "quotient",
+    ("the", "remainder", "of", "the", "quotient", "between"): "remainder",
+}
+
+_COMPARISON_OPERATORS = {
+    "positive_comparative": ">",
+    "negative_comparative": "<",
+    "neutral_comparative": "==",
+}
+
+
+class _Generator:
+    def __init__(self, play, names):
+        self.play = play
+        self.names: list[str] = names
+        self.variables = {name: f"c{i}" for i, name in enumerate(self.names)}
+        self.stacks = {name: f"s{i}" for i, name in enumerate(self.names)}
+        self.objects = {name: f"k{i}" for i, name in enumerate(self.names)}
+        self.constants = dict(_HELPERS)
+        self._constant_ids: dict[int, str] = {}
+        self.lines: list[str] = []
+        self.line_table: dict[int, tuple] = {}
+        self.labels = self._find_labels()
+
+    def generate(self) -> str:
+        end = len(self.play.operations)
+        self._emit(0, f"def {_FUNCTION_NAME}(state, settings, label):")
+        self._emit(1, "characters = state.characters")
+        self._emit(1, "on_stage = state._characters_on_stage")
+        self._emit(1, "assert_on_stage = state.assert_character_on_stage")
+        self._emit(1, "character_opposite = state.character_opposite")
+        self._emit(1, "read_number = settings.input_manager.consume_numeric_input")
+        self._emit(1, "read_character = settings.input_manager.consume_character_input")
+        self._emit(1, "write_number = settings.output_manager.output_number")
+        self._emit(1, "write_character = settings.output_manager.output_character")
+        for name in self.names:
+            self._emit(1, f"# {name}")
+            self._emit(1, f"{self.objects[name]} = characters[{name!r}]")
+            self._emit(1, f"{self.stacks[name]} = {self.objects[name]}.stack")
+            self._emit(1, f"{self.variables[name]} = {self.objects[name]}.value")
+        self._emit(1, "gb = state.global_boolean")
+        self._emit(1, "try:")
+        self._emit(2, "while True:")
+        labels = sorted(self.labels)
+        if labels:
+            self._emit_dispatch(labels, 3)
+        else:
+            self._emit(3, f"return {end}")
+        self._emit(1, "finally:")
+        for name in self.names:
+            self._emit(2, f"{self.objects[name]}.value = {self.variables[name]}")
+        self._emit(2, "state.global_boolean = gb")
+        return "\n".join(self.lines) + "\n"
+
+    def _find_labels(self) -> set[int]:
+        end = len(self.play.operations)
+        labels = {0} if end else set()
+        labels.update(self.play.act_indices.values())
+        for scenes in self.play.scene_indices.values():
+            labels.update(scenes.values())
+        for position, operation in enumerate(self.play.operations):
+            if isinstance(operation, Breakpoint):
+                labels.add(position + 1)
+        return {label for label in labels if label < end}
+
+    def _emit(self, indent: int, line: str, position=None, parseinfo=None) -> None:
+        self.lines.append("    " * indent + line)
+        if position is not None:
+            self.line_table[len(self.lines)] = (position, parseinfo)
+
+    def _emit_dispatch(self, labels: list[int], indent: int) -> None:
+        if len(labels) == 1:
+            self._emit_block(labels[0], indent)
+            return
+        middle = len(labels) // 2
+        self._emit(indent, f"if label < {labels[middle]}:")
+        self._emit_dispatch(labels[:middle], indent + 1)
+        self._emit(indent, "else:")
+        self._emit_dispatch(labels[middle:], indent + 1)
+
+    def _emit_block(self, label: int, indent: int) -> None:
+        end = len(self.play.operations)
+        position = label
+        while True:
+            self._emit_operation(position, indent)
+            position += 1
+            if position >= end:
+                self._emit(indent, f"return {end}")
+                return
+            if position in self.labels:
+                self._emit(indent, f"label = {position}")
+                return
+
+    def _emit_operation(self, position: int, indent: int) -> None:
+        operation = self.play.operations[position]
+        parseinfo = operation.ast_node.parseinfo
+        text = parseinfo.tokenizer.text[parseinfo.pos : parseinfo.endpos]
+        self._emit(indent, f"# line {parseinfo.line + 1}: {' '.join(text.split())}")
+
+        if isinstance(operation, Breakpoint):
+            self._emit(indent, f"return {position}")
+            return
+
+        def emit(line, extra_indent=0, attach=True):
+            self._emit(
+                indent + extra_indent,
+                line,
+                position,
+                parseinfo if attach else None,
+            )
+
+        if isinstance(operation, Entrance):
+            emit(f"state.enter_characters({operation.characters!r})")
+        elif isinstance(operation, Exit):
+            emit(f"state.exit_character({operation.character!r})")
+        elif isinstance(operation, Exeunt):
+            if operation.characters is None:
+                emit("state.exeunt_all()")
+            else:
+                emit(f"state.exeunt_characters({operation.characters!r})")
+        else:
+            self._emit_sentence(operation, position, emit)
+
+    def _emit_sentence(self, operation, position: int, emit) -> None:
+        speaker = operation.character
+        emit(
+            f"if {speaker!r} not in on_stage: assert_on_stage({speaker!r})",
+            attach=False,
+        )
+        if speaker not in self.variables:
+            # Not in the dramatis personae, so the check above always fails.
+            return
+
+        extra_indent = 0
+        if operation.has_condition:
+            test = "gb" if operation.condition_type_positive else "not gb"
+            emit(f"if {test}:", attach=False)
+            extra_indent = 1
+
+        if isinstance(operation, Goto):
+            self._emit_goto(
+                operation,
+                position,
+                lambda line, attach=True: emit(line, extra_indent, attach),
+            )
+            return
+
+        def emit_body(line):
+            emit(line, extra_indent)
+
+        if isinstance(operation, Question):
+            first = self._expression(operation.first_value)
+            second = self._expression(operation.second_value)
+            comparison = _COMPARISON_OPERATORS[
+                operation.op_ast_node.comparative.parseinfo.rule
+            ]
+            emit_body(f"gb = {first} {comparison} {second}")
+        elif isinstance(operation, Assignment):
+            emit_body(f"target = character_opposite({speaker!r})")
+            value = self._expression(operation.value)
+            self._emit_store(emit_body, speaker, value)
+        elif isinstance(operation, Input):
+            emit_body(f"target = character_opposite({speaker!r})")
+            reader = "read_number" if operation.input_type == "number" else "read_character"
+            self._emit_store(emit_body, speaker, f"{reader}()")
+        elif isinstance(operation, Output):
+            writer = (
+                "write_number" if operation.output_type == "number" else "write_character"
+            )
+            emit_body(f"{writer}({self._opposite_value(speaker, 'None')})")
+        elif isinstance(operation, Push):
+            emit_body(f"target = character_opposite({speaker!r})")
+            value = self._expression(operation.value)
+            emit_body(f"value = {value}")
+            self._emit_dispatch_on_target(
+                emit_body, speaker, lambda name: f"{self.stacks[name]}.append(value)"
+            )
+        elif isinstance(operation, Pop):
+            emit_body(f"target = character_opposite({speaker!r})")
+            self._emit_dispatch_on_target(
+                emit_body,
+                speaker,
+                lambda name: (
+                    f"{self.variables[name]} = "
+                    f"{self.stacks[name]}.pop() if {self.stacks[name]} else empty_stack()"
+                ),
+            )
+
+    def _emit_goto(self, operation, position: int, emit) -> None:
+        new_position = operation._static_destination(position, self.play)
+        if new_position is None:
+            message = f"{operation.target} {operation.destination} does not exist."
+            emit(f"fail({message!r})", attach=False)
+            return
+        emit(f"label = {new_position}")
+        emit("continue")
+
+    def _emit_store(self, emit, speaker: str, value: str) -> None:
+        emit(f"value = {value}")
+        self._emit_dispatch_on_target(
+            emit, speaker, lambda name: f"{self.variables[name]} = value"
+        )
+
+    def _emit_dispatch_on_target(self, emit, speaker: str, statement) -> None:
+        # target is the character opposite the speaker, so never the speaker.
+        candidates = [name for name in self.names if name != speaker]
+        for i, name in enumerate(candidates):
+            keyword = "if" if i == 0 else "elif"
+            emit(f"{keyword} target == {name!r}: {statement(name)}")
+
+    def _opposite_value(self, speaker: str, parseinfo_source: str) -> str:
+        candidates = [name for name in self.names if name != speaker]
+        lookup = f"opposite(state, {speaker!r}, {parseinfo_source})"
+        if not candidates:
+            return lookup
+        if len(candidates) == 1:
+            return f"({lookup} and {self.variables[candidates[0]]})"
+        expression = self.variables[candidates[-1]]
+        for name in reversed(candidates[:-1]):
+            expression = (
+                f"({self.variables[name]} if {lookup} == {name!r} else {expression})"
+            )
+        return expression
+
+    def _constant(self, value) -> str:
+        if id(value) not in self._constant_ids:
+            name = f"P{len(self._constant_ids)}"
+            self._constant_ids[id(value)] = name
+            self.constants[name] = value
+        return self._constant_ids[id(value)]
+
+    def _expression(self, expression: Expression) -> str:
+        if isinstance(expression, FirstPersonValue):
+            return self.variables[expression.character]
+        if isinstance(expression, SecondPersonValue):
+            parseinfo = self._constant(expression.ast_node.parseinfo)
+            return self._opposite_value(expression.character, parseinfo)
+        if isinstance(expression, CharacterName):
+            if expression.name not in self.variables:
+                parseinfo = self._constant(expression.ast_node.parseinfo)
+                return f"not_initialized({expression.name!r}, {parseinfo})"
+            return self.variables[expression.name]
+        if isinstance(expression, (NegativeNounPhrase, PositiveNounPhrase, Nothing)):
+            return repr(expression._evaluate_logic(None))  # type: ignore
+        if isinstance(expression, UnaryOperation):
+            operand = self._expression(expression.operand)
+            operator = expression.ast_node.operation
+            if operator in _UNARY_TEMPLATES:
+                return _UNARY_TEMPLATES[operator].format(operand)
+            parseinfo = self._constant(expression.ast_node.parseinfo)
+            return f"{_UNARY_HELPERS[operator]}({operand}, {parseinfo})"
+        if isinstance(expression, BinaryOperation):
+            first = self._expression(expression.first_operand)
+            second = self._expression(expression.second_operand)
+            operator = expression.ast_node.operation
+            if operator in _BINARY_TEMPLATES:
+                return _BINARY_TEMPLATES[operator].format(first, second)
+            parseinfo = self._constant(expression.ast_node.parseinfo)
+            return f"{_BINARY_HELPERS[operator]}({first}, {second}, {parseinfo})"
+        raise TypeError(f"Cannot transpile {type(expression).__name__}")
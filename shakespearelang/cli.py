@@ -63,12 +63,44 @@ def console(characters):
     default="basic",
     help="Output style to use. 'basic' is the default and outputs exactly what the SPL play generated. 'verbose' prefixes output and shows visible representations of whitespace characters. 'debug' is like 'verbose' but with debug output from the interpreter.",
 )
+@click.option(
+    "--engine",
+    default="closures",
+    help="Engine to execute the play with. 'closures' is the default and compiles each operation into a Python closure. 'python' transpiles the whole play into a single Python function.",
+)
 @pretty_print_shakespeare_errors
-def run(file, input_style, output_style):
+def run(file, input_style, output_style, engine):
     """Execute the Shakespeare Programming Language play located at filepath FILE."""
     with open(file, "r") as f:
         play = f.read()
-    Shakespeare(play, input_style=input_style, output_style=output_style).run()
+    Shakespeare(
+        play, input_style=input_style, output_style=output_style, engine=engine
+    ).run()
+
+
+@main.command(name="compile")
+@click.argument("file")
+@click.option(
+    "--emit-python",
+    is_flag=True,
+    help="Output the Python source code the play is transpiled into by the 'python' engine.",
+)
+@click.option(
+    "-o",
+    "--output",
+    default="-",
+    help="Filepath to write the output to. Default is standard output.",
+)
+@pretty_print_shakespeare_errors
+def compile_play(file, emit_python, output):
+    """Compile the Shakespeare Programming Language play located at filepath FILE."""
+    if not emit_python:
+        raise click.UsageError("Specify what to compile the play to, e.g. --emit-python.")
+    with open(file, "r") as f:
+        play = f.read()
+    source = Shakespeare(play).python_source()
+    with click.open_file(output, "w") as f:
+        f.write(source)
 
 
 @main.command()
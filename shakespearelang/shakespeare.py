@@ -17,11 +17,13 @@ from ._operation import (
     operation_from_sentence,
     Goto,
     Breakpoint,
+    BreakpointReached,
     Operation,
 )
 from ._parser import shakespeareParser
 from ._preprocess import Play
 from ._state import State
+from ._transpile import PythonProgram, cached_program, cache_program
 from ._utils import parseinfo_context, normalize_name
 from .errors import ShakespeareRuntimeError, ShakespeareParseError
 from .settings import Settings
@@ -68,6 +70,7 @@ class Shakespeare:
         play: Union[str, AST],
         input_style: Literal["basic", "interactive", "reader"] = "basic",
         output_style: Literal["basic", "verbose", "debug"] = "basic",
+        engine: Literal["closures", "python"] = "closures",
         **kwargs,
     ):
         """
@@ -88,12 +91,33 @@ class Shakespeare:
                 This is passed directly along to the [Settings][shakespearelang.Settings]
                 instance for this interpreter. To change after initialization,
                 modify that instance at the .settings property of the interpreter.
+            engine: How the play is executed when the output style is 'basic'.
+                'closures' is the default and compiles each operation into a
+                Python closure. 'python' transpiles the whole play into a single
+                Python function; the result is cached by play source, so
+                interpreters created again for the same play skip parsing and
+                code generation.
         """
+        if engine not in ["closures", "python"]:
+            raise ValueError("Unknown engine")
         self.settings = Settings(input_style, output_style, **kwargs)
         self.parser = shakespeareParser()
-        ast = self._parse_if_necessary(play, "play")
+        self.engine = engine
+        self._python_program = None
+
+        cached = None
+        if engine == "python" and isinstance(play, str):
+            cached = cached_program(play)
+        if cached:
+            ast, self._python_program = cached
+        else:
+            ast = self._parse_if_necessary(play, "play")
         self.play = Play(ast)
         self.state = State(ast.dramatis_personae)
+        if engine == "python" and self._python_program is None:
+            self._python_program = PythonProgram(self.play, list(self.state.characters))
+            if isinstance(play, str):
+                cache_program(play, ast, self._python_program)
 
         self.current_position = 0
 
@@ -110,12 +134,31 @@ class Shakespeare:
                 continues. The default is to do nothing.
         """
         while not self.play_over():
+            if self.settings.output_style == "basic":
+                # Runs up to the next breakpoint, or the end of the play.
+                if self._python_program is None:
+                    self._run_compiled()
+                elif self._python_program.can_start_at(self.current_position):
+                    self._python_program.run(self)
+                if self.play_over():
+                    break
+
             if isinstance(self._next_operation(), Breakpoint):
                 self._advance_position()
                 breakpoint_callback()
             else:
                 self.step_forward()
 
+    def python_source(self) -> str:
+        """
+        Returns:
+            The source code of the Python function the play is transpiled into
+            by the 'python' engine.
+        """
+        if self._python_program is None:
+            return PythonProgram(self.play, list(self.state.characters)).source
+        return self._python_program.source
+
     @_add_interpreter_context_to_errors
     def play_over(self) -> bool:
         """
@@ -215,6 +258,20 @@ class Shakespeare:
         else:
             operation.run(self.state, self.settings)
 
+    def _run_compiled(self):
+        operations = self.play.compiled_operations
+        state = self.state
+        settings = self.settings
+        end = len(operations)
+        position = self.current_position
+        try:
+            while position < end:
+                position = operations[position](state, settings)
+        except BreakpointReached:
+            pass
+        finally:
+            self.current_position = position
+
     def _parse_if_necessary(self, item, rule_name):
         if not isinstance(item, str):
             return item
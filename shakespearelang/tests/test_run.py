@@ -0,0 +1,215 @@
+from shakespearelang import Shakespeare
+from shakespearelang.errors import ShakespeareRuntimeError
+from io import StringIO
+from pathlib import Path
+import pytest
+
+COUNTDOWN = """
+    A Countdown.
+
+    Romeo, a test.
+    Juliet, a test.
+
+    Act I: The only act.
+    Scene I: The setup.
+
+    [Enter Romeo and Juliet]
+
+    Juliet: You are as good as the sum of a big cat and a cat.
+
+    Scene II: The loop.
+
+    Juliet: Open your heart! You are as good as the difference between
+            yourself and a cat. Are you better than nothing?
+
+    Juliet: If so, let us return to Scene II.
+
+    [A pause]
+
+    Juliet: Remember yourself! Recall your imminent death!
+
+    [Exeunt]
+"""
+
+
+ENGINES = ["closures", "python"]
+
+
+def run_to_completion(play, step, engine="closures"):
+    s = Shakespeare(play, engine=engine)
+    if step:
+        while not s.play_over():
+            s.step_forward()
+    else:
+        s.run()
+    return s
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_run_matches_stepping(engine, capsys):
+    stepped = run_to_completion(COUNTDOWN, step=True)
+    stepped_output = capsys.readouterr()
+
+    ran = run_to_completion(COUNTDOWN, step=False, engine=engine)
+    ran_output = capsys.readouterr()
+
+    assert ran_output.out == stepped_output.out == "321"
+    assert ran_output.err == stepped_output.err == ""
+    assert str(ran.state) == str(stepped.state)
+    assert ran.current_position == stepped.current_position
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_run_pauses_at_breakpoints(engine, capsys):
+    s = Shakespeare(COUNTDOWN, engine=engine)
+    positions = []
+    s.run(lambda: positions.append(s.current_position))
+
+    assert positions == [7]
+    assert s.play_over()
+
+    captured = capsys.readouterr()
+    assert captured.out == "321"
+    assert captured.err == ""
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_run_uses_state_changed_at_breakpoint(engine, capsys):
+    s = Shakespeare(COUNTDOWN, engine=engine)
+
+    def on_breakpoint():
+        s.state.character_by_name("Romeo").value = 42
+
+    s.run(on_breakpoint)
+
+    assert s.state.character_by_name("Romeo").value == 42
+    assert list(s.state.character_by_name("Romeo").stack) == []
+
+    captured = capsys.readouterr()
+    assert captured.out == "321"
+    assert captured.err == ""
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize(
+    "sentence,message,has_context",
+    [
+        ("You are the quotient between a cat and nothing.", "divide by zero", True),
+        ("You are the factorial of a pig.", "factorial of a negative", True),
+        ("You are as good as Macbeth.", "Macbeth was not initialized!", True),
+        ("Recall your mind!", "pop from an empty stack", True),
+        ("Let us return to scene IV.", "Scene IV does not exist.", False),
+        ("Let us return to act II.", "Act II does not exist.", False),
+    ],
+)
+def test_run_errors_match_stepping(engine, sentence, message, has_context):
+    play = f"""
+        Errors.
+
+        Romeo, a test.
+        Juliet, a test.
+
+        Act I: The only act.
+        Scene I: The error.
+
+        [Enter Romeo and Juliet]
+
+        Juliet: {sentence}
+    """
+
+    errors = []
+    for step in [True, False]:
+        with pytest.raises(ShakespeareRuntimeError) as exc:
+            run_to_completion(play, step, engine)
+        errors.append(exc.value)
+
+    stepped_error, ran_error = errors
+    assert message in ran_error.message
+    assert (ran_error.parseinfo is not None) == has_context
+    assert str(ran_error) == str(stepped_error)
+    assert ran_error.interpreter.current_position == 1
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_run_goto_to_own_scene_carries_on(engine, capsys):
+    play = """
+        Going Nowhere.
+
+        Romeo, a test.
+        Juliet, a test.
+
+        Act I: The only act.
+        Scene I: The start.
+
+        [Enter Romeo and Juliet]
+
+        Scene II: The same place.
+
+        Juliet: Let us proceed to scene II. Open your heart!
+    """
+
+    run_to_completion(play, step=True)
+    stepped_output = capsys.readouterr()
+
+    run_to_completion(play, step=False, engine=engine)
+    ran_output = capsys.readouterr()
+
+    assert ran_output.out == stepped_output.out == "0"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_run_off_stage_speaker(engine):
+    s = Shakespeare(
+        """
+        Errors.
+
+        Romeo, a test.
+        Juliet, a test.
+
+        Act I: The only act.
+        Scene I: The error.
+
+        [Enter Romeo]
+
+        Juliet: You are nothing.
+        """,
+        engine=engine,
+    )
+    with pytest.raises(ShakespeareRuntimeError) as exc:
+        s.run()
+    assert exc.value.message == "Juliet is not on stage!"
+    assert exc.value.parseinfo is None
+    assert s.current_position == 1
+
+
+def test_run_falls_back_for_verbose_output(capsys):
+    s = Shakespeare(COUNTDOWN, output_style="verbose")
+    s.run()
+
+    captured = capsys.readouterr()
+    assert "Outputting number: 3" in captured.out
+    assert "Jumping to Scene II" in captured.out
+
+
+def test_python_engine_reuses_cached_program(capsys):
+    first = Shakespeare(COUNTDOWN, engine="python")
+    second = Shakespeare(COUNTDOWN, engine="python")
+
+    assert second.play.operations[0].ast_node is first.play.operations[0].ast_node
+    assert second.python_source() == first.python_source()
+    assert second.state is not first.state
+
+    first.run()
+    second.run()
+    captured = capsys.readouterr()
+    assert captured.out == "321321"
+    assert captured.err == ""
+
+
+def test_python_source_is_a_function():
+    source = Shakespeare(COUNTDOWN).python_source()
+    namespace = {}
+    exec(source, namespace)
+
+    assert callable(namespace["run_play"])
+    assert "# line 19: If so, let us return to Scene II." in source